@@ -1,21 +1,58 @@
 import os
 import time
 import logging
+import threading
+import orjson
 import requests
 import pandas as pd
 from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+class TokenBucket:
+    """A thread-safe token bucket that blocks only when no tokens are left."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: int = 1) -> None:
+        """Takes tokens from the bucket, sleeping until enough have refilled."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
 class TMDBDataFetcher:
     """A production-grade fetcher for TMDB movie data."""
     
-    def __init__(self, env_path: str = "../../.env"):
+    def __init__(self, 
+                 env_path: str = "../../.env", 
+                 max_workers: int = 8, 
+                 cache_ttl: int = 86400,
+                 session: Optional[requests.Session] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
         self._load_config(env_path)
-        self.session = self._get_session()
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        # Passing an existing session (e.g. another fetcher's) reuses its keep-alive pool
+        self.session = session if session is not None else self._get_session()
         self.base_url = "https://api.themoviedb.org/3/movie"
+        # Caps in-flight requests independently of the worker pool size
+        self._request_slots = threading.Semaphore(4)
+        # TMDB allows roughly 40 requests per 10 seconds
+        self.bucket = TokenBucket(rate=4.0, capacity=40)
 
     def _load_config(self, env_path: str):
         """Loads environment variables and sets up paths."""
@@ -27,7 +64,8 @@ class TMDBDataFetcher:
             
         # Define paths relative to this class
         self.raw_data_dir = os.path.join(os.path.dirname(__file__), "../../data/raw")
-        os.makedirs(self.raw_data_dir, exist_ok=True)
+        self.cache_dir = os.path.join(self.raw_data_dir, "cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
 
     def _get_session(self) -> requests.Session:
         """Creates a requests session with built-in retry logic."""
@@ -39,15 +77,44 @@ class TMDBDataFetcher:
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS"]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Single host: one pool, sized so every worker keeps its own keep-alive connection
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=1,
+            pool_maxsize=self.max_workers
+        )
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         return session
 
+    def _read_cache(self, movie_id: int) -> Optional[dict]:
+        """Returns a cached response if it exists and is younger than the TTL."""
+        cache_path = os.path.join(self.cache_dir, f"{movie_id}.json")
+        try:
+            if time.time() - os.path.getmtime(cache_path) > self.cache_ttl:
+                return None
+            with open(cache_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, movie_id: int, data: dict):
+        """Persists a successful response so reruns skip the network."""
+        cache_path = os.path.join(self.cache_dir, f"{movie_id}.json")
+        try:
+            with open(cache_path, 'wb') as f:
+                f.write(orjson.dumps(data))
+        except OSError as e:
+            self.logger.warning(f"Could not cache ID {movie_id}: {e}")
+
     def fetch_single_movie(self, movie_id: int) -> Optional[dict]:
-        """Fetches a single movie with error handling and timeouts."""
+        """Fetches a single movie with error handling, timeouts and a disk cache."""
         if movie_id == 0:
             return None
+
+        cached = self._read_cache(movie_id)
+        if cached is not None:
+            return cached
             
         params = {
             "api_key": self.api_key,
@@ -55,14 +122,18 @@ class TMDBDataFetcher:
         }
         
         try:
-            # Added timeout (10s) to prevent hanging
-            response = self.session.get(
-                f"{self.base_url}/{movie_id}", 
-                params=params, 
-                timeout=10
-            )
+            self.bucket.consume(1)
+            with self._request_slots:
+                # Added timeout (10s) to prevent hanging
+                response = self.session.get(
+                    f"{self.base_url}/{movie_id}", 
+                    params=params, 
+                    timeout=10
+                )
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            self._write_cache(movie_id, data)
+            return data
         except requests.exceptions.HTTPError as e:
             self.logger.warning(f"ID {movie_id} failed: {e.response.status_code}")
         except Exception as e:
@@ -72,30 +143,40 @@ class TMDBDataFetcher:
     def run_pipeline(self, movie_ids: List[int]) -> pd.DataFrame:
         """Executes the full extraction and saving process."""
         start_time = time.time()
-        results = []
+        fetched = {}
         
         self.logger.info(f"Starting extraction for {len(movie_ids)} IDs...")
         
-        for mid in movie_ids:
-            data = self.fetch_single_movie(mid)
-            if data:
-                results.append(data)
-                self.logger.info(f"Fetched: {data.get('title', mid)}")
-            
-            # Compliance with TMDB rate limits (approx 4 req/sec)
-            time.sleep(0.25)
+        # Overlap network waits across a bounded worker pool
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_single_movie, mid): mid
+                for mid in movie_ids if mid != 0
+            }
+            for future in as_completed(futures):
+                mid = futures[future]
+                data = future.result()
+                if data:
+                    fetched[mid] = data
+                    self.logger.info(f"Fetched: {data.get('title', mid)}")
 
+        # Restore the requested ID order regardless of completion order
+        results = [fetched[mid] for mid in dict.fromkeys(movie_ids) if mid in fetched]
+        # Raw responses are persisted untouched for auditing; nested fields are
+        # flattened once, by MovieTransformer.flatten_json_columns
+        self._save_data(results)
         df = pd.DataFrame(results)
-        self._save_data(df)
         
         duration = time.time() - start_time
         self.logger.info(f"Pipeline complete. {len(df)} movies saved in {duration:.2f}s")
         return df
 
-    def _save_data(self, df: pd.DataFrame):
-        """Saves the DataFrame to the raw data directory."""
+    def _save_data(self, results: List[dict]):
+        """Saves the raw API responses to the raw data directory without a pandas round trip."""
         output_path = os.path.join(self.raw_data_dir, "movies.json")
-        df.to_json(output_path, orient='records', indent=4)
+        # Compact orjson output straight from the response dicts; no indentation
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY))
         self.logger.info(f"Data persisted to {output_path}")
 
 # --- Execution Block ---
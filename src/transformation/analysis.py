@@ -1,9 +1,11 @@
 import os
+import sys
 import logging
-import json
+import orjson
 import numpy as np
 import pandas as pd
-from typing import List, Optional, Union
+from tabulate import tabulate
+from typing import List, Optional
 
 class MovieAnalyzer:
     """
@@ -11,19 +13,21 @@ class MovieAnalyzer:
     Advanced Search requirements.
     """
     
-    def __init__(self, cleaned_csv_path: str):
+    def __init__(self, cleaned_data_path: str):
         """
-        Initialize the MovieAnalyzer with cleaned data.
+        Initialize the MovieAnalyzer with cleaned (Parquet) data.
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         
-        if not os.path.exists(cleaned_csv_path):
-            self.logger.error(f"Cleaned data missing: {cleaned_csv_path}")
+        if not os.path.exists(cleaned_data_path):
+            self.logger.error(f"Cleaned data missing: {cleaned_data_path}")
             raise FileNotFoundError(f"Ensure process.py has run first.")
             
-        self.df = pd.read_csv(cleaned_csv_path)
-        self.logger.info(f"Loaded {len(self.df)} rows from cleaned CSV.")
+        # Arrow-backed columns: contiguous typed buffers and native string/groupby kernels
+        self.df = pd.read_parquet(cleaned_data_path, dtype_backend='pyarrow')
+        self.logger.info(f"Loaded {len(self.df)} rows from cleaned Parquet.")
         self._calculate_base_kpis()
+        self._build_search_sets()
 
     def _calculate_base_kpis(self) -> None:
         """Requirement 1: KPI Implementation (Profit & ROI)."""
@@ -31,38 +35,55 @@ class MovieAnalyzer:
             self.df['profit_musd'] = self.df['revenue_musd'] - self.df['budget_musd']
         
         if 'roi' not in self.df.columns:
-            # ROI = Revenue / Budget
-            self.df['roi'] = np.where(
-                self.df['budget_musd'] > 0, 
-                self.df['revenue_musd'] / self.df['budget_musd'], 
-                np.nan
-            )
+            # ROI = Revenue / Budget; zero/missing budgets divide by a 1.0 placeholder and are masked to NaN
+            budget = self.df['budget_musd'].to_numpy(dtype='float64', na_value=np.nan)
+            revenue = self.df['revenue_musd'].to_numpy(dtype='float64', na_value=np.nan)
+            has_budget = budget > 0
+            self.df['roi'] = np.where(has_budget, revenue / np.where(has_budget, budget, 1.0), np.nan)
+
+        if 'belongs_to_collection' in self.df.columns:
+            self.df['is_franchise'] = self.df['belongs_to_collection'].notna()
+        self._reset_group_stats()
         self.logger.info("KPIs verified.")
 
     def enrich_with_credits(self, raw_json_path: str) -> None:
-        """Requirement 3: Merging for Advanced Filtering (Actor/Director)."""
-        with open(raw_json_path, 'r') as f:
-            raw_data = json.load(f)
+        """
+        Requirement 3: Merging for Advanced Filtering (Actor/Director).
+        Legacy path: cleaned data from MovieTransformer already carries cast/director.
+        """
+        if {'cast', 'director'}.issubset(self.df.columns):
+            self.logger.info("Cast/director already present in cleaned data; skipping raw merge.")
+            return
+
+        # Imported here so analysis.py still runs as a plain script (the report never takes this path)
+        from src.transformation.process import extract_credits
+
+        with open(raw_json_path, 'rb') as f:
+            raw_data = orjson.loads(f.read())
         
-        df_credits = pd.DataFrame(raw_data)[['id', 'credits']]
-        self.df = pd.merge(self.df, df_credits, on='id', how='left')
+        # Project to id -> credits while loading: a dict lookup replaces a full frame + merge
+        credits_map = {record['id']: record.get('credits') for record in raw_data}
         
-        self.df['cast'] = self.df['credits'].apply(self._extract_cast)
-        self.df['director'] = self.df['credits'].apply(self._extract_director)
-        self.df.drop(columns=['credits'], inplace=True)
+        # Single pass over the id array instead of two Series.apply scans
+        casts, directors = [], []
+        for movie_id in self.df['id'].to_numpy():
+            cast, director = extract_credits(credits_map.get(movie_id))
+            casts.append(cast)
+            directors.append(director)
+        self.df['cast'] = casts
+        self.df['director'] = directors
+        self._build_search_sets()
+        self._reset_group_stats()
         self.logger.info("Enriched cleaned data with cast/director features.")
 
-    @staticmethod
-    def _extract_cast(credits_data: Union[dict, float, None]) -> str:
-        if isinstance(credits_data, dict) and 'cast' in credits_data:
-            return "|".join([x['name'] for x in credits_data['cast'][:5]])
-        return ""
-
-    @staticmethod
-    def _extract_director(credits_data: Union[dict, float, None]) -> str:
-        if isinstance(credits_data, dict) and 'crew' in credits_data:
-            return "|".join([x['name'] for x in credits_data['crew'] if x.get('job') == 'Director'])
-        return ""
+    def _build_search_sets(self) -> None:
+        """Splits pipe-delimited columns once into lowercase frozensets for O(1) lookups."""
+        for col in ('genres', 'cast', 'director'):
+            if col in self.df.columns:
+                self.df[f'_{col}_set'] = [
+                    frozenset(s.lower().split('|')) if isinstance(s, str) else frozenset()
+                    for s in self.df[col].to_numpy()
+                ]
 
     # --- REQUIREMENT 2: UDF FOR RANKING ---
     def rank_movies(self, 
@@ -77,22 +98,95 @@ class MovieAnalyzer:
         if show_cols is None:
             show_cols = ['title', criteria_col, 'genres', 'revenue_musd', 'profit_musd', 'roi', 'vote_average']
             
-        ranked = target_df.sort_values(by=criteria_col, ascending=ascending).head(top_n)
-        return ranked[[c for c in show_cols if c in ranked.columns]]
+        ranked = self._top_k(target_df, criteria_col, top_n, ascending)
+        return ranked[[c for c in dict.fromkeys(show_cols) if c in ranked.columns]]
+
+    @staticmethod
+    def _top_k(df: pd.DataFrame, col: str, k: int, ascending: bool = False) -> pd.DataFrame:
+        """Selects the top k rows by `col` via an O(N) partial sort, then sorts only those k."""
+        if k <= 0 or k > len(df) // 4 or not pd.api.types.is_numeric_dtype(df[col]):
+            return df.sort_values(by=col, ascending=ascending).head(k)
+
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        # NaN partitions to the end either way, matching sort_values' na_position='last'
+        keys = values if ascending else -values
+        candidates = np.argpartition(keys, k - 1)[:k]
+        return df.iloc[candidates].sort_values(by=col, ascending=ascending)
+
+    # --- REQUIREMENT 3: ADVANCED SEARCH MASKS ---
+    def search_mask(self, 
+                    genres: Optional[List[str]] = None, 
+                    cast: Optional[List[str]] = None, 
+                    director: Optional[List[str]] = None) -> pd.Series:
+        """Case-insensitive mask of movies matching every given genre, cast member and director."""
+        mask = np.ones(len(self.df), dtype=bool)
+        for col, wanted in (('genres', genres), ('cast', cast), ('director', director)):
+            if not wanted:
+                continue
+            wanted_set = frozenset(w.lower() for w in wanted)
+            mask &= np.fromiter(
+                (wanted_set <= s for s in self.df[f'_{col}_set']), 
+                dtype=bool, count=len(self.df)
+            )
+        return pd.Series(mask, index=self.df.index)
+
+    # --- GROUPED AGGREGATIONS (computed once, shared by Requirements 4-6) ---
+    def _reset_group_stats(self) -> None:
+        """Invalidates cached aggregations whenever self.df changes shape or columns."""
+        self._franchise_stats = None
+        self._collection_stats = None
+        self._director_stats = None
+        self._group_stats_built = False
+
+    def _build_group_stats(self) -> None:
+        """
+        Computes franchise, collection and director aggregations in one sweep and caches them.
+        Each aggregation is skipped (left as None) when its key column is missing.
+        """
+        if 'belongs_to_collection' in self.df.columns:
+            self._franchise_stats = self.df.groupby('is_franchise', sort=False).agg(
+                revenue_musd=('revenue_musd', 'mean'),
+                roi=('roi', 'median'),
+                budget_musd=('budget_musd', 'mean'),
+                popularity=('popularity', 'mean'),
+                vote_average=('vote_average', 'mean'),
+                movie_count=('title', 'count')
+            ).sort_index()
+
+            # NaN collections (standalone movies) are dropped by groupby itself
+            self._collection_stats = self.df.groupby('belongs_to_collection', sort=False, observed=True).agg(
+                title_count=('title', 'count'),
+                budget_musd_sum=('budget_musd', 'sum'),
+                budget_musd_mean=('budget_musd', 'mean'),
+                revenue_musd_sum=('revenue_musd', 'sum'),
+                revenue_musd_mean=('revenue_musd', 'mean'),
+                vote_average_mean=('vote_average', 'mean')
+            ).sort_values(by='revenue_musd_sum', ascending=False)
+
+        if 'director' in self.df.columns:
+            self._director_stats = self.df[self.df['director'] != ""].groupby('director', sort=False, observed=True).agg(
+                total_movies=('title', 'count'),
+                total_revenue=('revenue_musd', 'sum'),
+                vote_average=('vote_average', 'mean')
+            ).sort_values(by='total_revenue', ascending=False)
+        self._group_stats_built = True
+
+    def _ensure_group_stats(self) -> None:
+        if not getattr(self, '_group_stats_built', False):
+            self._build_group_stats()
+
+    def _require_collection_stats(self) -> None:
+        """Builds the cached aggregations, failing clearly if franchise data is absent."""
+        self._ensure_group_stats()
+        if self._franchise_stats is None:
+            self.logger.error("Collection data missing from analyzer data.")
+            raise KeyError("belongs_to_collection")
 
     # --- REQUIREMENT 4: FRANCHISE VS STANDALONE ---
     def get_franchise_comparison(self) -> pd.DataFrame:
         """Compare franchises vs standalone movies across multiple means."""
-        self.df['is_franchise'] = self.df['belongs_to_collection'].notna()
-        
-        stats = self.df.groupby('is_franchise').agg({
-            'revenue_musd': 'mean',
-            'roi': 'median',
-            'budget_musd': 'mean',
-            'popularity': 'mean',
-            'vote_average': 'mean',
-            'title': 'count'
-        }).rename(columns={'title': 'movie_count'})
+        self._require_collection_stats()
+        stats = self._franchise_stats.copy()
         
         label_map = {False: 'Standalone', True: 'Franchise'}
         stats.index = stats.index.map(label_map)
@@ -101,26 +195,63 @@ class MovieAnalyzer:
     # --- REQUIREMENT 5: SUCCESSFUL FRANCHISES ---
     def get_most_successful_franchises(self, top_n: int = 5) -> pd.DataFrame:
         """Rank franchises by total revenue and counts."""
-        franchise_df = self.df[self.df['belongs_to_collection'].notna()]
-        
-        success = franchise_df.groupby('belongs_to_collection').agg({
-            'title': 'count',
-            'budget_musd': ['sum', 'mean'],
-            'revenue_musd': ['sum', 'mean'],
-            'vote_average': 'mean'
-        })
-        
-        # Flatten MultiIndex columns
-        success.columns = ['_'.join(col).strip() for col in success.columns.values]
-        return success.sort_values(by='revenue_musd_sum', ascending=False).head(top_n).round(2)
+        self._require_collection_stats()
+        return self._collection_stats.head(top_n).round(2)
 
     # --- REQUIREMENT 6: SUCCESSFUL DIRECTORS ---
     def get_most_successful_directors(self, top_n: int = 5) -> pd.DataFrame:
         """Rank directors by total revenue and movie count."""
-        success = self.df[self.df['director'] != ""].groupby('director').agg({
-            'title': 'count',
-            'revenue_musd': 'sum',
-            'vote_average': 'mean'
-        }).rename(columns={'title': 'total_movies', 'revenue_musd': 'total_revenue'})
-        
-        return success.sort_values(by='total_revenue', ascending=False).head(top_n).round(2)
\ No newline at end of file
+        self._ensure_group_stats()
+        if self._director_stats is None:
+            self.logger.error("Director data missing from analyzer data.")
+            raise ValueError("Run enrich_with_credits first.")
+        return self._director_stats.head(top_n).round(2)
+
+def print_ranking(title: str, df: pd.DataFrame) -> None:
+    """Renders a titled ranking table once and writes it to stdout in a single call."""
+    table = tabulate(df, headers='keys', tablefmt='github', showindex=False)
+    sys.stdout.write(f"\n--- {title} ---\n{table}\n")
+
+
+def main():
+    """Runs the full KPI report; nothing executes when the module is imported."""
+    data_dir = os.path.join(os.path.dirname(__file__), "../../data")
+    analyzer = MovieAnalyzer(os.path.join(data_dir, "processed/movies_clean.parquet"))
+    df = analyzer.df
+
+    # 1. KPI Rankings
+    budget_mask = df['budget_musd'] >= 10
+    vote_mask = df['vote_count'] >= 10
+    rankings = [
+        ("Highest Revenue", dict(criteria_col='revenue_musd')),
+        ("Highest Budget", dict(criteria_col='budget_musd')),
+        ("Highest Profit", dict(criteria_col='profit_musd')),
+        ("Lowest Profit", dict(criteria_col='profit_musd', ascending=True)),
+        ("Highest ROI (Budget >= 10M)", dict(criteria_col='roi', mask=budget_mask)),
+        ("Lowest ROI (Budget >= 10M)", dict(criteria_col='roi', ascending=True, mask=budget_mask)),
+        ("Most Voted", dict(criteria_col='vote_count')),
+        ("Highest Rated (Votes >= 10)", dict(criteria_col='vote_average', mask=vote_mask)),
+        ("Lowest Rated (Votes >= 10)", dict(criteria_col='vote_average', ascending=True, mask=vote_mask)),
+        ("Most Popular", dict(criteria_col='popularity'))
+    ]
+    for title, kwargs in rankings:
+        print_ranking(title, analyzer.rank_movies(**kwargs))
+
+    # 2. Advanced Search Queries
+    search_1 = analyzer.search_mask(genres=["Science Fiction", "Action"], cast=["Bruce Willis"])
+    print_ranking("Search 1: Bruce Willis (Sci-Fi / Action)", 
+                  analyzer.rank_movies('vote_average', mask=search_1))
+    search_2 = analyzer.search_mask(cast=["Uma Thurman"], director=["Quentin Tarantino"])
+    print_ranking("Search 2: Uma Thurman & Quentin Tarantino (Shortest First)", 
+                  analyzer.rank_movies('runtime', ascending=True, mask=search_2, 
+                                       show_cols=['title', 'runtime', 'director']))
+
+    # 3. Aggregated Performance
+    print_ranking("Franchise vs Standalone", analyzer.get_franchise_comparison().reset_index())
+    print_ranking("Most Successful Franchises", analyzer.get_most_successful_franchises().reset_index())
+    print_ranking("Most Successful Directors", analyzer.get_most_successful_directors().reset_index())
+
+# --- Execution Block ---
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
\ No newline at end of file
@@ -21,7 +21,7 @@ def test_financial_conversion(sample_raw_data):
     transformer = MovieTransformer()
     
     # FIX: Match the parameter name 'df' to satisfy Pylance
-    transformer._save_to_csv = lambda df: None 
+    transformer._save = lambda df: None 
     
     df_clean = transformer.run_transformation(sample_raw_data)
     
@@ -33,7 +33,7 @@ def test_json_flattening(sample_raw_data):
     transformer = MovieTransformer()
     
     # FIX: Match the parameter name 'df' to satisfy Pylance
-    transformer._save_to_csv = lambda df: None
+    transformer._save = lambda df: None
     
     df_clean = transformer.run_transformation(sample_raw_data)
     
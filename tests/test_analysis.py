@@ -21,6 +21,7 @@ def test_franchise_analysis_single_category():
     analyzer = MovieAnalyzer.__new__(MovieAnalyzer)
     analyzer.df = df
     analyzer.logger = logging.getLogger("Test")
+    analyzer._calculate_base_kpis()
     
     stats = analyzer.get_franchise_comparison()
     
@@ -44,4 +45,58 @@ def test_roi_calculation_with_zero_budget():
     analyzer._calculate_base_kpis()
     
     # Fixed: "np" now defined
-    assert np.isnan(analyzer.df.iloc[0]['roi'])
\ No newline at end of file
+    assert np.isnan(analyzer.df.iloc[0]['roi'])
+
+def test_search_mask_matches_all_terms_case_insensitively():
+    """Search masks should require every term and ignore case."""
+    df = pd.DataFrame({
+        'id': [1, 2, 3],
+        'title': ['A', 'B', 'C'],
+        'genres': ['Action|Science Fiction', 'Action', np.nan],
+        'cast': ['Bruce Willis|Milla Jovovich', 'Bruce Willis', '']
+    })
+
+    analyzer = MovieAnalyzer.__new__(MovieAnalyzer)
+    analyzer.df = df
+    analyzer.logger = logging.getLogger("Test")
+    analyzer._build_search_sets()
+
+    mask = analyzer.search_mask(genres=['science fiction', 'Action'], cast=['bruce willis'])
+
+    assert mask.tolist() == [True, False, False]
+
+
+@pytest.mark.parametrize("ascending", [False, True])
+def test_top_k_matches_full_sort(ascending):
+    """Partial-sort ranking should return the same rows as a full sort, NaNs last."""
+    rng = np.random.default_rng(0)
+    values = rng.permutation(100).astype(float)
+    values[[3, 50]] = np.nan
+    df = pd.DataFrame({'title': [f"M{i}" for i in range(100)], 'score': values})
+
+    expected = df.sort_values(by='score', ascending=ascending).head(5)
+    result = MovieAnalyzer._top_k(df, 'score', 5, ascending)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_directors_ranked_without_collection_column():
+    """Director rankings must not depend on franchise data being present."""
+    df = pd.DataFrame({
+        'id': [1, 2],
+        'title': ['A', 'B'],
+        'revenue_musd': [100.0, 300.0],
+        'budget_musd': [50.0, 100.0],
+        'vote_average': [7.0, 8.0],
+        'director': ['Jane Doe', 'John Roe']
+    })
+
+    analyzer = MovieAnalyzer.__new__(MovieAnalyzer)
+    analyzer.df = df
+    analyzer.logger = logging.getLogger("Test")
+    analyzer._calculate_base_kpis()
+
+    directors = analyzer.get_most_successful_directors()
+
+    assert list(directors.index) == ['John Roe', 'Jane Doe']
+    with pytest.raises(KeyError):
+        analyzer.get_franchise_comparison()
@@ -1,10 +1,13 @@
+import time
 import pytest
 from unittest.mock import MagicMock, patch
-from src.extraction.fetch_data import TMDBDataFetcher
+from src.extraction.fetch_data import TMDBDataFetcher, TokenBucket
 
 @pytest.fixture
-def fetcher_instance():
-    return TMDBDataFetcher()
+def fetcher_instance(tmp_path):
+    fetcher = TMDBDataFetcher()
+    fetcher.cache_dir = str(tmp_path)
+    return fetcher
 
 @patch('src.extraction.fetch_data.requests.Session.get')
 def test_fetch_single_movie_success(mock_get, fetcher_instance):
@@ -18,4 +21,49 @@ def test_fetch_single_movie_success(mock_get, fetcher_instance):
     result = fetcher_instance.fetch_single_movie(123)
 
     assert result['title'] == 'Mock Movie'
-    assert mock_get.called
\ No newline at end of file
+    assert mock_get.called
+
+def test_run_pipeline_preserves_id_order(fetcher_instance):
+    """Concurrent fetches should still return movies in the requested order."""
+    fetcher_instance._save_data = lambda results: None
+    fetcher_instance.fetch_single_movie = lambda mid: {'id': mid, 'title': f"Movie {mid}"}
+
+    df = fetcher_instance.run_pipeline([0, 30, 10, 20])
+
+    assert df['id'].tolist() == [30, 10, 20]
+
+
+def test_token_bucket_blocks_when_empty():
+    """The bucket should allow a burst up to capacity, then wait for refill."""
+    bucket = TokenBucket(rate=100.0, capacity=2)
+
+    start = time.monotonic()
+    bucket.consume(1)
+    bucket.consume(1)
+    bucket.consume(1)
+    total = time.monotonic() - start
+
+    # Only the lower bound is timing-safe: the third token needs >= 1/rate seconds of refill
+    assert total >= 0.005
+
+
+
+@patch('src.extraction.fetch_data.requests.Session.get')
+def test_fetch_single_movie_uses_cache(mock_get, fetcher_instance):
+    """A second fetch of the same ID should be served from the disk cache."""
+    mock_response = MagicMock()
+    mock_response.json.return_value = {'id': 123, 'title': 'Mock Movie'}
+    mock_get.return_value = mock_response
+
+    first = fetcher_instance.fetch_single_movie(123)
+    second = fetcher_instance.fetch_single_movie(123)
+
+    assert first == second
+    assert mock_get.call_count == 1
+
+
+def test_fetchers_can_share_a_session(fetcher_instance):
+    """A second fetcher should reuse an injected session instead of opening a new pool."""
+    other = TMDBDataFetcher(session=fetcher_instance.session)
+
+    assert other.session is fetcher_instance.session
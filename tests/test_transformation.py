@@ -0,0 +1,39 @@
+import pandas as pd
+from src.transformation.process import MovieTransformer
+
+def test_credits_extracted_to_cast_and_director():
+    """Verify that nested credits become top-5 cast and director strings."""
+    transformer = MovieTransformer()
+    df_raw = pd.DataFrame([{
+        'id': 100,
+        'credits': {
+            'cast': [{'name': f"Actor {i}"} for i in range(7)],
+            'crew': [{'name': 'Jane Doe', 'job': 'Director'}, {'name': 'John Roe', 'job': 'Editor'}]
+        }
+    }])
+    
+    df_flat = transformer.flatten_json_columns(df_raw)
+    
+    assert df_flat.iloc[0]['cast'] == "Actor 0|Actor 1|Actor 2|Actor 3|Actor 4"
+    assert df_flat.iloc[0]['director'] == "Jane Doe"
+    assert 'credits' not in df_flat.columns
+
+
+def test_load_raw_projects_away_dropped_columns(tmp_path):
+    """Verify that irrelevant raw columns never reach the loaded DataFrame."""
+    raw_path = tmp_path / "movies.json"
+    raw_path.write_text('[{"id": 1, "title": "A", "adult": false, "imdb_id": "tt1", "homepage": ""}]')
+    
+    df_raw = MovieTransformer().load_raw(str(raw_path))
+    
+    assert list(df_raw.columns) == ['id', 'title']
+
+
+def test_downcast_numeric_keeps_vote_count_schema_stable():
+    """vote_count should export as Int32 however small the counts are, with float32 measures."""
+    df = pd.DataFrame({'vote_count': [3, None], 'vote_average': [7.5, 8.0]})
+    
+    df_small = MovieTransformer().downcast_numeric(df)
+    
+    assert df_small['vote_count'].dtype == 'Int32'
+    assert df_small['vote_average'].dtype == 'float32'
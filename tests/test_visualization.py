@@ -0,0 +1,11 @@
+import numpy as np
+import pandas as pd
+from src.visualization import MovieVisualizer
+
+def test_release_year_handles_timezone_aware_dates():
+    """Timezone-aware dates with a NaT should yield NaN years instead of failing the datetime64 cast."""
+    release_date = pd.Series(pd.to_datetime(['2020-01-02', None]).tz_localize('UTC'))
+
+    years = MovieVisualizer._release_year(release_date)
+
+    np.testing.assert_array_equal(years, [2020.0, np.nan])